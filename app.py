@@ -8,6 +8,7 @@ import time
 from dotenv import load_dotenv
 from langchain_core.tools import tool
 from pydantic import BaseModel, Field
+from ingestion import SpeakerTurn, turns_to_transcript
 
 # Load environment variables from .env file
 load_dotenv()
@@ -17,6 +18,7 @@ llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash", temperature=0.6)
 # AgentState 
 class AgentState(TypedDict):
     raw_transcript: str
+    speaker_turns: Optional[List[SpeakerTurn]]
     cleaned_transcript: Optional[str]
     extracted_data: Optional[Dict[str, Union[List[str], str, List[Dict]]]]
     meeting_summary: Optional[str]
@@ -90,6 +92,7 @@ def final_reporter_agent(state: AgentState) -> AgentState:
     action_items = state.get("action_items", [])
     key_decisions = state.get("key_decisions", [])
     extracted_data = state.get("extracted_data", {})
+    speaker_turns = state.get("speaker_turns") or []
     # Use 'cleaned_transcript' directly for the reference section,
     # as it's the version that has potentially gone through preprocessing.
     cleaned_transcript_content = state.get("cleaned_transcript", "No transcript available.") 
@@ -154,6 +157,22 @@ def final_reporter_agent(state: AgentState) -> AgentState:
     if times:
         report_sections.append(f"- **Time-related Expressions:** {', '.join(times)}\n")
 
+    # Speakers and meeting duration come from the caption/transcript metadata, when available
+    turn_counts = {}
+    for turn in speaker_turns:
+        if turn["speaker"]:
+            turn_counts[turn["speaker"]] = turn_counts.get(turn["speaker"], 0) + 1
+    if turn_counts:
+        speakers = [f"{speaker} ({count} turns)" for speaker, count in turn_counts.items()]
+        report_sections.append(f"- **Speakers:** {', '.join(speakers)}\n")
+
+    starts = [turn["start"] for turn in speaker_turns if turn["start"] is not None]
+    ends = [turn["end"] for turn in speaker_turns if turn["end"] is not None]
+    if starts and ends and max(ends) > min(starts):
+        minutes, seconds = divmod(int(max(ends) - min(starts)), 60)
+        hours, minutes = divmod(minutes, 60)
+        report_sections.append(f"- **Duration:** {hours}:{minutes:02d}:{seconds:02d}\n")
+
     # --- Full Cleaned Transcript (for reference) ---
     # report_sections.append("\n---\n") # Horizontal rule for visual separation
     # report_sections.append("## Full Cleaned Transcript (for reference)\n")
@@ -405,16 +424,28 @@ workflow.add_edge("final_reporter", END) # The last node directly ends the graph
 app = workflow.compile()
 
 # This is the single function that Gradio will interact with.
-def get_meeting_summary_report(transcript_text: str) -> str:
+def get_meeting_summary_report(transcript: Union[str, List[SpeakerTurn]], speaker_turns: Optional[List[SpeakerTurn]] = None) -> str:
     """
     Invokes the LangGraph workflow with the given transcript and returns the final report.
+    The transcript is either plain text or the speaker turns produced by ingestion.py.
+    Callers that have already rendered the turns can pass that text along with speaker_turns.
+    When transcript is itself a list of turns, it is the single source: the text is rendered
+    from it and any speaker_turns argument is ignored.
+    The turns' speakers and timestamps are used by the final reporter, never by the prompts.
     """
+    if isinstance(transcript, list):
+        # Turns passed directly take precedence over the speaker_turns argument
+        speaker_turns = transcript
+        transcript_text = turns_to_transcript(speaker_turns)
+    else:
+        transcript_text = transcript
+
     # Basic validation for input
     if not transcript_text or transcript_text.strip() == "":
         return "Please provide a meeting transcript to summarize."
 
     # Initial state for the graph execution
-    initial_state = {"raw_transcript": transcript_text, "next_node": "transcript_preprocessor"}
+    initial_state = {"raw_transcript": transcript_text, "speaker_turns": speaker_turns, "next_node": "transcript_preprocessor"}
 
     try:
         # Invoke the compiled LangGraph application
@@ -1,9 +1,11 @@
 # gradio_ui.py
 import gradio as gr
 import os
+from typing import List, Union
 from dotenv import load_dotenv
 import pypdf
 from validator import TranscriptValidator
+from ingestion import TRANSCRIPT_PARSERS, SpeakerTurn, read_speaker_turns, turns_to_transcript
 load_dotenv()
 
 # Import the function that runs your LangGraph app
@@ -12,8 +14,11 @@ from app import get_meeting_summary_report
 transcript_validator = TranscriptValidator()
 
 # --- Helper function to read content from uploaded file ---
-def read_file_content(file_obj) -> str:
-    """Reads content from an uploaded file object (txt or pdf)."""
+def read_file_content(file_obj) -> Union[str, List[SpeakerTurn]]:
+    """
+    Reads content from an uploaded file object (txt, pdf, vtt, srt, json or jsonl).
+    Caption/transcript formats are returned as a list of speaker turns.
+    """
     if file_obj is None:
         return ""
     
@@ -42,8 +47,14 @@ def read_file_content(file_obj) -> str:
         except Exception as e:
             gr.Warning(f"Could not read PDF file. Make sure it's not an image-based PDF or corrupted: {e}")
             return f"Error reading PDF: {e}"
+    elif file_extension in TRANSCRIPT_PARSERS:
+        try:
+            return read_speaker_turns(file_path)
+        except Exception as e:
+            gr.Warning(f"Error reading transcript file: {e}")
+            return f"Error reading transcript file: {e}"
     else:
-        gr.Warning(f"Unsupported file type: {file_extension}. Please upload a .txt or .pdf file.")
+        gr.Warning(f"Unsupported file type: {file_extension}. Please upload a .txt, .pdf or caption/transcript ({', '.join(TRANSCRIPT_PARSERS)}) file.")
         return ""
 
 # --- Unified function to handle both file and text input (retains gr.Progress if you still want it) ---
@@ -51,14 +62,21 @@ def unified_summarize_input(uploaded_file, pasted_text, progress=gr.Progress()):
     progress(0, desc="Initializing...")
 
     transcript_text = ""
+    # Parsed speaker turns, for caption/transcript files
+    speaker_turns = None
 
     # Existing logic to get transcript_text from file or pasted text
     if uploaded_file is not None:
         progress(0.05, desc="Reading uploaded file...")
-        transcript_text = read_file_content(uploaded_file)
-        if not transcript_text:
+        file_content = read_file_content(uploaded_file)
+        if not file_content:
             progress(1.0, desc="Error")
             return "No content found in the uploaded file, or an error occurred during reading/unsupported file type. Please try again."
+        if isinstance(file_content, list):
+            speaker_turns = file_content
+            transcript_text = turns_to_transcript(speaker_turns)
+        else:
+            transcript_text = file_content
     elif pasted_text and pasted_text.strip() != "":
         transcript_text = pasted_text
         progress(0.05, desc="Processing pasted text...")
@@ -79,7 +97,7 @@ def unified_summarize_input(uploaded_file, pasted_text, progress=gr.Progress()):
     progress(0.2, desc="Starting AI summarization pipeline...")
 
     try:
-        report = get_meeting_summary_report(transcript_text)
+        report = get_meeting_summary_report(transcript_text, speaker_turns=speaker_turns)
         progress(0.9, desc="Finalizing report...")
         return report
     except Exception as e:
@@ -103,8 +121,8 @@ def create_gradio_blocks_app():
             with gr.Tabs():
                 with gr.TabItem("Upload File"):
                     transcript_file_input = gr.File(
-                        label="Upload Meeting Transcript (.txt or .pdf)",
-                        file_types=[".txt", ".pdf"],
+                        label=f"Upload Meeting Transcript (.txt, .pdf, {', '.join(TRANSCRIPT_PARSERS)})",
+                        file_types=[".txt", ".pdf", *TRANSCRIPT_PARSERS],
                         type="filepath"
                     )
                 with gr.TabItem("Paste Text"):
@@ -0,0 +1,394 @@
+# ingestion.py
+import html
+import json
+import os
+import re
+from itertools import chain, islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple, TypedDict
+
+# A single merged speaker turn. Timestamps (in seconds) are kept here as metadata
+# and are deliberately left out of the text that ends up in the LLM prompts.
+class SpeakerTurn(TypedDict):
+    speaker: Optional[str]
+    text: str
+    start: Optional[float]
+    end: Optional[float]
+
+# (speaker, text, start, end) as yielded by the format parsers, before merging
+Cue = Tuple[Optional[str], str, Optional[float], Optional[float]]
+CueParser = Callable[[TextIO], Iterator[Cue]]
+
+_TIMESTAMP_RE = re.compile(r"(?:(\d+):)?(\d{1,2}):(\d{2})[.,](\d{1,3})")
+_VOICE_TAG_RE = re.compile(r"<v(?:\.[^\s>]*)?\s+([^>]+)>")
+_TAG_RE = re.compile(r"<[^>]*>")
+# 'Name:' speaker prefix (SRT, or WebVTT without voice tags): one to three words, starting with a letter.
+# _is_speaker_label narrows this down to name-like labels ('Speaker 1', 'SPEAKER_00', 'José García').
+_SPEAKER_PREFIX_RE = re.compile(r"^([^\W\d_][\w.'\-]*(?: [\w.'\-]+){0,2}):\s+(.+)$")
+# Lowercase words allowed inside a name, e.g. 'Ludwig van Beethoven'
+_NAME_PARTICLES = frozenset({"al", "bin", "da", "de", "del", "della", "der", "di", "du", "la", "le", "van", "von", "y"})
+# 'Name:' prefixes are only honoured when at least half of the first cues carry one
+_PREFIX_SAMPLE_SIZE = 50
+
+_JSON_SPEAKER_KEYS = ("speaker", "speaker_name", "name", "participant")
+_JSON_TEXT_KEYS = ("text", "content", "transcript")
+_JSON_START_KEYS = ("start", "start_time", "startTime")
+_JSON_END_KEYS = ("end", "end_time", "endTime")
+_JSON_START_MS_KEYS = ("start_ms", "startMs")
+_JSON_END_MS_KEYS = ("end_ms", "endMs")
+_JSON_LIST_KEYS = ("turns", "segments", "utterances", "results")
+# Wrappers whose numeric times are in milliseconds (AssemblyAI 'utterances')
+_JSON_MILLISECOND_LIST_KEYS = ("utterances",)
+_JSON_CHUNK_SIZE = 1 << 16
+# A value cut off at the end of the buffer fails to decode within a few characters of the end
+# ('tr' of 'true', a partial \uXXXX escape); errors further back are malformed input
+_JSON_TRUNCATION_MARGIN = 6
+
+# ------------------------------------------------------------------------------HELPERS-------------------------------------------------------------------------------------------------------------
+
+def _parse_timestamp(value: str) -> Optional[float]:
+    """Parses the first 'HH:MM:SS.mmm' / 'MM:SS,mmm' timestamp found in value into seconds."""
+    match = _TIMESTAMP_RE.search(value)
+    if not match:
+        return None
+    hours, minutes, seconds, fraction = match.groups()
+    return int(hours or 0) * 3600 + int(minutes) * 60 + int(seconds) + int(fraction.ljust(3, "0")) / 1000
+
+def _clean_caption(payload: str) -> str:
+    """Strips markup tags and HTML entities from caption text."""
+    if "<" in payload:
+        payload = _TAG_RE.sub("", payload)
+    if "&" in payload:
+        payload = html.unescape(payload)
+    return payload.strip()
+
+def _split_voice(payload: str) -> Tuple[Optional[str], str]:
+    """Separates the speaker named by a WebVTT <v> voice tag from the caption text."""
+    speaker = None
+    if "<" in payload:
+        voice = _VOICE_TAG_RE.search(payload)
+        if voice:
+            speaker = voice.group(1).strip()
+    return speaker, _clean_caption(payload)
+
+def _is_speaker_label(label: str) -> bool:
+    """Checks that every word of a prefix is capitalised, a number or a name particle."""
+    first, *rest = label.split(" ")
+    return first[0].isupper() and all(
+        word[0].isupper() or word[0].isdigit() or word in _NAME_PARTICLES for word in rest
+    )
+
+def _split_prefix(payload: str) -> Tuple[Optional[str], str]:
+    """Separates a 'Name:' speaker prefix from the caption text."""
+    text = _clean_caption(payload)
+    prefixed = _SPEAKER_PREFIX_RE.match(text)
+    if prefixed and _is_speaker_label(prefixed.group(1)):
+        return prefixed.group(1), prefixed.group(2).strip()
+    return None, text
+
+def _first_value(record: Dict, keys: Tuple[str, ...]):
+    for key in keys:
+        value = record.get(key)
+        if value is not None:
+            return value
+    return None
+
+def _json_time(value, millis: bool) -> Optional[float]:
+    # Numbers are seconds, or milliseconds when millis is set; strings may also be
+    # Google-style durations ('1.500s') or clock timestamps
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, str):
+        try:
+            value = float(value[:-1] if value.endswith("s") else value)
+        except ValueError:
+            return _parse_timestamp(value)
+    if isinstance(value, (int, float)):
+        return value / 1000 if millis else float(value)
+    return None
+
+def _json_span(record: Dict, keys: Tuple[str, ...], ms_keys: Tuple[str, ...], millis: bool) -> Optional[float]:
+    """Reads a start/end time in seconds, preferring explicit '*_ms' keys."""
+    value = _json_time(_first_value(record, ms_keys), millis=True)
+    if value is None:
+        value = _json_time(_first_value(record, keys), millis)
+    return value
+
+def _json_cue(record, millis: bool = False) -> Optional[Cue]:
+    if not isinstance(record, dict):
+        return None
+    text = _first_value(record, _JSON_TEXT_KEYS)
+    if not isinstance(text, str) or not text.strip():
+        return None
+    speaker = _first_value(record, _JSON_SPEAKER_KEYS)
+    return (
+        str(speaker).strip() or None if speaker is not None else None,
+        " ".join(text.split()),
+        _json_span(record, _JSON_START_KEYS, _JSON_START_MS_KEYS, millis),
+        _json_span(record, _JSON_END_KEYS, _JSON_END_MS_KEYS, millis),
+    )
+
+# ------------------------------------------------------------------------------PARSERS-------------------------------------------------------------------------------------------------------------
+
+def _iter_caption_blocks(f: TextIO) -> Iterator[Tuple[List[str], Optional[float], Optional[float]]]:
+    """
+    Incrementally splits WebVTT or SRT captions into (payload lines, start, end), one line at a time.
+    Cue numbers, identifiers, the WEBVTT header and NOTE/STYLE/REGION blocks are dropped;
+    only blocks with a '-->' timing line produce cues.
+    """
+    start = end = None
+    payload: List[str] = []
+    in_cue = False
+
+    for line in f:
+        line = line.strip()
+        if "-->" in line:
+            # Without a blank line between cues, the next cue's number ends up in this payload
+            if payload and payload[-1].isdigit():
+                payload.pop()
+            if payload:
+                yield payload, start, end
+                payload = []
+            head, _, tail = line.partition("-->")
+            start, end = _parse_timestamp(head), _parse_timestamp(tail)
+            in_cue = True
+        elif not line:
+            if payload:
+                yield payload, start, end
+                payload = []
+            in_cue = False
+        elif in_cue:
+            payload.append(line)
+
+    if payload:
+        yield payload, start, end
+
+def _caption_segments(payload: List[str], voice_tags: bool) -> List[str]:
+    """
+    Groups the payload lines of one cue by speaker. A line opening with a '- ' dialogue dash
+    (or, for WebVTT, carrying its own <v> tag) starts a new segment; other lines continue it.
+    """
+    segments: List[str] = []
+    for line in payload:
+        dash = line.startswith("- ")
+        if segments and not dash and not (voice_tags and "<v" in line):
+            segments[-1] += " " + line
+        else:
+            segments.append(line[2:] if dash else line)
+    return segments
+
+def _sample_prefix_convention(
+    blocks: Iterator[Tuple[List[str], Optional[float], Optional[float]]], voice_tags: bool
+) -> Tuple[Iterator[Tuple[List[str], Optional[float], Optional[float]]], bool]:
+    """
+    Looks ahead at the first caption blocks to decide whether the file labels speakers with
+    'Name:' prefixes, so that ordinary sentences containing a colon are not mistaken for them.
+    Returns the (unconsumed) blocks and whether prefixes should be honoured. For WebVTT, a
+    file that names its speakers with <v> voice tags never falls back to prefixes.
+    """
+    sample = list(islice(blocks, _PREFIX_SAMPLE_SIZE))
+    if voice_tags and any("<v" in line for payload, _, _ in sample for line in payload):
+        return chain(sample, blocks), False
+    labelled = sum(
+        1 for payload, _, _ in sample
+        if _split_prefix(_caption_segments(payload, voice_tags)[0])[0] is not None
+    )
+    return chain(sample, blocks), bool(sample) and labelled * 2 >= len(sample)
+
+def parse_vtt(f: TextIO) -> Iterator[Cue]:
+    """
+    Incrementally parses WebVTT captions. Speakers come from <v> voice tags; files without
+    voice tags (e.g. Zoom exports) fall back to consistently used 'Name:' prefixes.
+    """
+    blocks, use_prefix = _sample_prefix_convention(_iter_caption_blocks(f), voice_tags=True)
+
+    for payload, start, end in blocks:
+        for segment in _caption_segments(payload, voice_tags=True):
+            speaker, text = _split_voice(segment)
+            if speaker is None and use_prefix:
+                speaker, text = _split_prefix(segment)
+            if text:
+                yield (speaker, text, start, end)
+
+def parse_srt(f: TextIO) -> Iterator[Cue]:
+    """Incrementally parses SRT captions. Speakers come from consistently used 'Name:' prefixes."""
+    blocks, use_prefix = _sample_prefix_convention(_iter_caption_blocks(f), voice_tags=False)
+
+    for payload, start, end in blocks:
+        for segment in _caption_segments(payload, voice_tags=False):
+            if use_prefix:
+                speaker, text = _split_prefix(segment)
+            else:
+                speaker, text = None, _clean_caption(segment)
+            if text:
+                yield (speaker, text, start, end)
+
+def parse_json(f: TextIO) -> Iterator[Cue]:
+    """
+    Incrementally parses JSON speaker turns. Supports a top-level array of turn objects and
+    JSON Lines, both decoded one object at a time. A top-level object wrapping the turns under
+    'turns', 'segments', 'utterances' or 'results' is also accepted, but is decoded in one piece;
+    times under 'utterances' (AssemblyAI) are read as milliseconds.
+    Raises ValueError for an unterminated array, or when values decode but none is a speaker turn.
+    """
+    decoder = json.JSONDecoder()
+    buffer, pos, eof = "", 0, False
+    in_array = False
+    decoded = yielded = 0
+
+    while True:
+        while pos < len(buffer) and (buffer[pos].isspace() or (in_array and buffer[pos] == ",")):
+            pos += 1
+        if pos == len(buffer):
+            if eof:
+                if in_array:
+                    raise ValueError("Truncated JSON transcript: the top-level array is never closed.")
+                break
+            buffer, pos = f.read(_JSON_CHUNK_SIZE), 0
+            eof = not buffer
+            continue
+
+        char = buffer[pos]
+        if char == "[" and not in_array:
+            in_array = True
+            pos += 1
+            continue
+        if char == "]" and in_array:
+            in_array = False
+            pos += 1
+            continue
+
+        try:
+            value, pos = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError as err:
+            truncated = err.pos >= len(buffer) - _JSON_TRUNCATION_MARGIN or err.msg.startswith("Unterminated string")
+            if eof or not truncated:
+                raise
+            # Value is cut off at the end of the buffer: read more. Growing the read size with
+            # the pending value keeps a single oversized value from being re-decoded quadratically.
+            chunk = f.read(max(_JSON_CHUNK_SIZE, len(buffer) - pos))
+            buffer, pos = buffer[pos:] + chunk, 0
+            eof = not chunk
+            continue
+
+        decoded += 1
+        records, millis = [value], False
+        if isinstance(value, dict) and not in_array:
+            for key in _JSON_LIST_KEYS:
+                if isinstance(value.get(key), list):
+                    records, millis = value[key], key in _JSON_MILLISECOND_LIST_KEYS
+                    break
+        for record in records:
+            cue = _json_cue(record, millis)
+            if cue:
+                yielded += 1
+                yield cue
+
+    if decoded and not yielded:
+        raise ValueError("No speaker turns found in JSON transcript: expected objects with a 'text' field.")
+
+# Maps a file extension to the parser for that format. Add an entry (or use register_parser)
+# to support another transcript format.
+TRANSCRIPT_PARSERS: Dict[str, CueParser] = {
+    ".vtt": parse_vtt,
+    ".srt": parse_srt,
+    ".json": parse_json,
+    ".jsonl": parse_json,
+}
+
+def register_parser(extension: str, parser: CueParser) -> None:
+    """Registers a cue parser for the given file extension (e.g. '.sbv')."""
+    TRANSCRIPT_PARSERS[extension.lower()] = parser
+
+# ------------------------------------------------------------------------------TURNS-------------------------------------------------------------------------------------------------------------
+
+def merge_turns(cues: Iterable[Cue]) -> Iterator[SpeakerTurn]:
+    """
+    Merges consecutive cues from the same speaker into a single turn.
+    Cues without a speaker label continue the current turn, and a cue repeating the previous
+    cue's text (as rolling captions do) is dropped.
+    """
+    turn: Optional[SpeakerTurn] = None
+    parts: List[str] = []
+
+    for speaker, text, start, end in cues:
+        if turn is not None and (speaker is None or speaker == turn["speaker"]):
+            if text != parts[-1]:
+                parts.append(text)
+            if end is not None:
+                turn["end"] = end
+            continue
+        if turn is not None:
+            turn["text"] = " ".join(parts)
+            yield turn
+        turn = SpeakerTurn(speaker=speaker, text="", start=start, end=end)
+        parts = [text]
+
+    if turn is not None:
+        turn["text"] = " ".join(parts)
+        yield turn
+
+def iter_speaker_turns(file_path: str) -> Iterator[SpeakerTurn]:
+    """Streams merged speaker turns from a caption/transcript file, picking the parser by extension."""
+    extension = os.path.splitext(file_path)[1].lower()
+    parser = TRANSCRIPT_PARSERS.get(extension)
+    if parser is None:
+        raise ValueError(f"Unsupported transcript format: {extension}")
+    with open(file_path, "r", encoding="utf-8-sig") as f:
+        yield from merge_turns(parser(f))
+
+def read_speaker_turns(file_path: str) -> List[SpeakerTurn]:
+    """Reads a caption/transcript file into a compact list of speaker turns."""
+    return list(iter_speaker_turns(file_path))
+
+def turns_to_transcript(turns: Iterable[SpeakerTurn]) -> str:
+    """Renders speaker turns as prompt text, one 'Speaker: text' line per turn, without timestamps."""
+    return "\n".join(f"{turn['speaker']}: {turn['text']}" if turn["speaker"] else turn["text"] for turn in turns)
+
+# --- Parse throughput benchmark: python ingestion.py [size_mb] ---
+if __name__ == "__main__":
+    import sys
+    import tempfile
+    import time
+
+    size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    target_bytes = size_mb * 1024 * 1024
+    speakers = ["Alice Johnson", "Bob Smith", "Carol White"]
+    sentence = "We should finalize the Q3 budget and send the report to the committee by Friday."
+
+    def clock(seconds: float, sep: str) -> str:
+        ms = int(seconds * 1000)
+        return f"{ms // 3600000:02d}:{ms // 60000 % 60:02d}:{ms // 1000 % 60:02d}{sep}{ms % 1000:03d}"
+
+    def write_sample(path: str, fmt: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            written = f.write("WEBVTT\n\n" if fmt == "vtt" else "[\n" if fmt == "json" else "")
+            i = 0
+            while written < target_bytes:
+                # Two cues per speaker so merging has something to do
+                speaker = speakers[(i // 2) % len(speakers)]
+                start, end = i * 2.5, i * 2.5 + 2.5
+                if fmt == "vtt":
+                    block = f"{clock(start, '.')} --> {clock(end, '.')}\n<v {speaker}>{sentence}</v>\n\n"
+                elif fmt == "srt":
+                    block = f"{i + 1}\n{clock(start, ',')} --> {clock(end, ',')}\n{speaker}: {sentence}\n\n"
+                else:
+                    block = ("," if i else "") + json.dumps({"speaker": speaker, "text": sentence, "start": start, "end": end}) + "\n"
+                written += f.write(block)
+                i += 1
+            if fmt == "json":
+                f.write("]\n")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for fmt in ("vtt", "srt", "json"):
+            path = os.path.join(tmp_dir, f"sample.{fmt}")
+            write_sample(path, fmt)
+            file_mb = os.path.getsize(path) / (1024 * 1024)
+
+            started = time.perf_counter()
+            turns = read_speaker_turns(path)
+            elapsed = time.perf_counter() - started
+            prompt_mb = len(turns_to_transcript(turns).encode("utf-8")) / (1024 * 1024)
+
+            print(f"{fmt.upper():>4}: {file_mb:.1f} MB parsed in {elapsed:.2f}s ({file_mb / elapsed:.1f} MB/s), "
+                  f"{len(turns)} turns, prompt text {prompt_mb:.1f} MB")
+            os.remove(path)